@@ -1,531 +1,58 @@
 import concurrent.futures as cf
-import glob
+import hashlib
 import io
 import os
+import sys
+import threading
 import time
+from collections import deque
 from pathlib import Path
 from tempfile import NamedTemporaryFile
 from typing import List, Literal
+from uuid import uuid4
 
 import gradio as gr
+import httpx
 
 from loguru import logger
-from openai import OpenAI
+from openai import DefaultHttpxClient, OpenAI
 from promptic import llm
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ValidationError, field_validator
 from pypdf import PdfReader
-from tenacity import retry, retry_if_exception_type
+import pypdfium2 as pdfium
 
-from functools import wraps
+from functools import lru_cache, wraps
 
 import re
 
-# Enable LiteLLM debug mode for troubleshooting
-try:
-    import litellm
-    litellm.set_verbose = True
-except ImportError:
-    pass
+from instruction_templates import INSTRUCTION_TEMPLATES
+
+# Enable LiteLLM debug mode for troubleshooting (PDF2AUDIO_DEBUG=1)
+if os.environ.get("PDF2AUDIO_DEBUG") == "1":
+    try:
+        import litellm
+        litellm.set_verbose = True
+    except ImportError:
+        pass
+
+# Metadata enclosed in -- ... --, written without a lazy .*? so it scans linearly
+_META_RE = re.compile(r'--[^-]*(?:-(?!-)[^-]*)*--', re.DOTALL)
+
+@lru_cache(maxsize=4)
+def _read_readme_cached(path: str, mtime_ns: int) -> str:
+    # mtime_ns is only part of the cache key, so an edited README is re-read
+    content = Path(path).read_text(encoding="utf-8")
+    # Use regex to remove metadata enclosed in -- ... --
+    return _META_RE.sub('', content)
 
 def read_readme():
     readme_path = Path("README.md")
-    if readme_path.exists():
-        with open(readme_path, "r") as file:
-            content = file.read()
-            # Use regex to remove metadata enclosed in -- ... --
-            content = re.sub(r'--.*?--', '', content, flags=re.DOTALL)
-            return content
-    else:
+    try:
+        mtime_ns = readme_path.stat().st_mtime_ns
+    except FileNotFoundError:
         return "README.md not found. Please check the repository for more information."
+    return _read_readme_cached(str(readme_path), mtime_ns)
         
-# Define multiple sets of instruction templates
-INSTRUCTION_TEMPLATES = {
-
-################# PODCAST ##################
-    "podcast": {
-        "intro": """Your task is to take the input text provided and turn it into an lively, engaging, informative podcast dialogue, in the style of NPR. Do not use or make up names. The input text may be messy or unstructured, as it could come from a variety of sources like PDFs or web pages. 
-
-Don't worry about the formatting issues or any irrelevant information; your goal is to extract the key points, identify definitions, and interesting facts that could be discussed in a podcast. 
-
-Define all terms used carefully for a broad audience of listeners.
-""",
-        "text_instructions": "First, carefully read through the input text and identify the main topics, key points, and any interesting facts or anecdotes. Think about how you could present this information in a fun, engaging way that would be suitable for a high quality presentation.",
-        "scratch_pad": """Brainstorm creative ways to discuss the main topics and key points you identified in the input text. Consider using analogies, examples, storytelling techniques, or hypothetical scenarios to make the content more relatable and engaging for listeners.
-
-Keep in mind that your podcast should be accessible to a general audience, so avoid using too much jargon or assuming prior knowledge of the topic. If necessary, think of ways to briefly explain any complex concepts in simple terms.
-
-Use your imagination to fill in any gaps in the input text or to come up with thought-provoking questions that could be explored in the podcast. The goal is to create an informative and entertaining dialogue, so feel free to be creative in your approach.
-
-Define all terms used clearly and spend effort to explain the background.
-
-Write your brainstorming ideas and a rough outline for the podcast dialogue here. Be sure to note the key insights and takeaways you want to reiterate at the end.
-
-Make sure to make it fun and exciting. 
-""",
-        "prelude": """Now that you have brainstormed ideas and created a rough outline, it's time to write the actual podcast dialogue. Aim for a natural, conversational flow between the host and any guest speakers. Incorporate the best ideas from your brainstorming session and make sure to explain any complex topics in an easy-to-understand way.
-""",
-        "dialog": """Write a very long, engaging, informative podcast dialogue here, based on the key points and creative ideas you came up with during the brainstorming session. Use a conversational tone and include any necessary context or explanations to make the content accessible to a general audience. 
-
-Never use made-up names for the hosts and guests, but make it an engaging and immersive experience for listeners. Do not include any bracketed placeholders like [Host] or [Guest]. Design your output to be read aloud -- it will be directly converted into audio.
-
-Make the dialogue as long and detailed as possible, while still staying on topic and maintaining an engaging flow. Aim to use your full output capacity to create the longest podcast episode you can, while still communicating the key information from the input text in an entertaining way.
-
-At the end of the dialogue, have the host and guest speakers naturally summarize the main insights and takeaways from their discussion. This should flow organically from the conversation, reiterating the key points in a casual, conversational manner. Avoid making it sound like an obvious recap - the goal is to reinforce the central ideas one last time before signing off. 
-
-The podcast should have around 20000 words.
-""",
-    },
-    
-################# DEEP DATA ANALYSIS ##################
-    "deep research analysis": {
-    # 1) High‑level task description 
-    "intro": """You are a senior analyst who conducts deep research.
-    
-Your job is to turn the raw materials supplied below (PDF text, markdown, tables, figures or loose CSV/TXT files) into a **deep research report** that humans can read.
-
-The finished report must contain, in this exact order:
-
-1. **Metadata block** – start with the title/s, authors, publication years (as they are available). If not available, start by describing the types of raw materials you analyzed.  
-2. **Data extraction** – careful extraction of key data and quantitative information, presented as a carefully crafted narrative. For example, discuss the domain, industry, area of science. Define. all terms. 
-3. **Key insights** – interpretation of the results.  This must be comprehensive and include your thoughts and interpretation, and context. 
-4. **Examples** – pick a few examples to illustrate the key concepts (one or more). Use strong storytelling to show depth while making it broadly understandable.  
-5. **Strengths** – strengths of the results or data, paper or information in the raw materials. 
-6. **Weaknesses** – assess weaknesses of the document, paper or data. 
-7. **Relating to other fields** – relate the raw materials to other fields, historical results, contemperary work, or other significant concepts. Discuss the significance.
-8. **Open questions / action items** – what further analysis or experiments would you recommend?
-
-Keep the narrative clear and concise, suitable for a technically literate audience, with depth.  Do **not** reveal chain‑of‑thought; only present the final reasoning.""",
-
-    # 2) How to read / transform the source material
-    "text_instructions": """Carefully scan the input text for any data, insights, and so on.  
-If tables are broken across lines, reconstruct them logically to extract key insights.  
-
-Translate uncommon units to SI in parentheses, and explain.""",
-
-    # 3) Scratch‑pad / brainstorming (hidden from end‑user)
-    "scratch_pad": """Brainstorm here (hidden):  
-- Map each table to a clean DataFrame name.  
-- Decide which statistical measures are meaningful.  
-- Note any assumptions or gap‑filling you’ll need (e.g., missing column headers), uncertainties, issues with the data, and. soon.  
-When ready, compile the final report strictly following the template above.""",
-
-    # 4) Prelude that introduces the report proper
-    "prelude": """Below is the structured report based on the supplied raw data:""",
-
-    # 5) Main output instructions
-     "dialog": """Design your output to be read aloud -- it will be directly converted into audio. The presentation of materials should include 30,000 words.
-
-If you have equations, variables or other complex concepts, make sure to design your output so that it can be clearly rendered by a text-to-voice model. 
-
-There is only one speaker, you. Stay on topic and maintaining an engaging flow. 
-
-Write a clear, detailed, and well-prepared analysis and report as a single narrator.  Begin every paragraph with `speaker-1:`."""
-},
-
-
-################# CLEAN READ‑THROUGH ##################
-"clean rendering": {
-    # 1) What the model should do
-    "intro": """You are a careful narrator tasked with producing an **accurate, faithful rendering** of the supplied document so it can be read aloud.
-
-Your priorities are:
-• Preserve the original wording and ordering of the content.  
-• Remove anything that is clearly an artefact of page layout (page numbers, running headers/footers, line numbers, PDF crop marks, hyphen‑splits at line wraps).  
-• Keep mathematical symbols, equations and variable names intact, but read them in a way a TTS system can pronounce (e.g. “square root of”, “alpha sub i”).  
-• Do **not** add commentary, summaries, or extra explanations—just the cleaned text.  
-• Present everything in the **same sequence** as in the source.
-
-Output must be suitable for text‑to‑speech; begin every paragraph with `speaker-1:` and write as a single narrator.""",
-
-    # 2) How to cleanse the raw text
-    "text_instructions": """Scan the input for artefacts such as:
-
-- Stand‑alone page numbers or headers like “Page 12 of 30”  
-- Repeated footers, URLs or timestamps  
-- Manual hyphenation at line breaks (join split words)  
-- Broken tables or columns (flatten them into continuous sentences where possible)
-
-Strip these while keeping all legitimate content. Do **not** reorder paragraphs or sentences.""",
-
-    # 3) Hidden scratch‑pad for the model
-    "scratch_pad": """Brainstorm here (hidden):
-- Identify obvious header/footer patterns to delete.
-- Decide how to handle any malformed tables (e.g. read row‑by‑row).
-- Note any equations that need a spoken equivalent.
-After cleaning decisions are made, move on to generate the final narration.""",
-
-    # 4) Prelude before the narration starts
-    "prelude": """Below is the faithful narration of the provided document (cleaned of layout artefacts, otherwise unchanged):""",
-
-    # 5) Main output instructions
-    "dialog": """Design your output to be read aloud—no markup, no bracketed directions.  
-Only one speaker (`speaker-1:`).  
-Maintain original headings and paragraph breaks where they naturally occur in the source.  
-If an equation appears, read it in a TTS‑friendly style (e.g. `speaker-1: E equals m times c squared`)."""
-},
-
-
-################# MATERIAL DISCOVERY SUMMARY ##################
-    "SciAgents material discovery summary": {
-        "intro": """Your task is to take the input text provided and turn it into a lively, engaging conversation between a professor and a student in a panel discussion that describes a new material. The professor acts like Richard Feynman, but you never mention the name.
-
-The input text is the result of a design developed by SciAgents, an AI tool for scientific discovery that has come up with a detailed materials design.
-
-Don't worry about the formatting issues or any irrelevant information; your goal is to extract the key points, identify definitions, and interesting facts that could be discussed in a podcast.
-
-Define all terms used carefully for a broad audience of listeners.
-""",
-        "text_instructions": "First, carefully read through the input text and identify the main topics, key points, and any interesting facts or anecdotes. Think about how you could present this information in a fun, engaging way that would be suitable for a high quality presentation.",
-        "scratch_pad": """Brainstorm creative ways to discuss the main topics and key points you identified in the material design summary, especially paying attention to design features developed by SciAgents. Consider using analogies, examples, storytelling techniques, or hypothetical scenarios to make the content more relatable and engaging for listeners.
-
-Keep in mind that your description should be accessible to a general audience, so avoid using too much jargon or assuming prior knowledge of the topic. If necessary, think of ways to briefly explain any complex concepts in simple terms.
-
-Use your imagination to fill in any gaps in the input text or to come up with thought-provoking questions that could be explored in the podcast. The goal is to create an informative and entertaining dialogue, so feel free to be creative in your approach.
-
-Define all terms used clearly and spend effort to explain the background.
-
-Write your brainstorming ideas and a rough outline for the podcast dialogue here. Be sure to note the key insights and takeaways you want to reiterate at the end.
-
-Make sure to make it fun and exciting. You never refer to the podcast, you just discuss the discovery and you focus on the new material design only.
-""",
-        "prelude": """Now that you have brainstormed ideas and created a rough outline, it's time to write the actual podcast dialogue. Aim for a natural, conversational flow between the host and any guest speakers. Incorporate the best ideas from your brainstorming session and make sure to explain any complex topics in an easy-to-understand way.
-""",
-        "dialog": """Write a very long, engaging, informative dialogue here, based on the key points and creative ideas you came up with during the brainstorming session. The presentation must focus on the novel aspects of the material design, behavior, and all related aspects.
-
-Use a conversational tone and include any necessary context or explanations to make the content accessible to a general audience, but make it detailed, logical, and technical so that it has all necessary aspects for listeners to understand the material and its unexpected properties.
-
-Remember, this describes a design developed by SciAgents, and this must be explicitly stated for the listeners.
-
-Never use made-up names for the hosts and guests, but make it an engaging and immersive experience for listeners. Do not include any bracketed placeholders like [Host] or [Guest]. Design your output to be read aloud -- it will be directly converted into audio.
-
-Make the dialogue as long and detailed as possible with great scientific depth, while still staying on topic and maintaining an engaging flow. Aim to use your full output capacity to create the longest podcast episode you can, while still communicating the key information from the input text in an entertaining way.
-
-At the end of the dialogue, have the host and guest speakers naturally summarize the main insights and takeaways from their discussion. This should flow organically from the conversation, reiterating the key points in a casual, conversational manner. Avoid making it sound like an obvious recap - the goal is to reinforce the central ideas one last time before signing off.
-
-The conversation should have around 20000 words.
-"""
-    },
-################# LECTURE ##################
-    "lecture": {
-        "intro": """You are Professor Richard Feynman. Your task is to develop a script for a lecture. You never mention your name.
-
-The material covered in the lecture is based on the provided text. 
-
-Don't worry about the formatting issues or any irrelevant information; your goal is to extract the key points, identify definitions, and interesting facts that need to be covered in the lecture. 
-
-Define all terms used carefully for a broad audience of students.
-""",
-        "text_instructions": "First, carefully read through the input text and identify the main topics, key points, and any interesting facts or anecdotes. Think about how you could present this information in a fun, engaging way that would be suitable for a high quality presentation.",
-        "scratch_pad": """
-Brainstorm creative ways to discuss the main topics and key points you identified in the input text. Consider using analogies, examples, storytelling techniques, or hypothetical scenarios to make the content more relatable and engaging for listeners.
-
-Keep in mind that your lecture should be accessible to a general audience, so avoid using too much jargon or assuming prior knowledge of the topic. If necessary, think of ways to briefly explain any complex concepts in simple terms.
-
-Use your imagination to fill in any gaps in the input text or to come up with thought-provoking questions that could be explored in the podcast. The goal is to create an informative and entertaining dialogue, so feel free to be creative in your approach.
-
-Define all terms used clearly and spend effort to explain the background.
-
-Write your brainstorming ideas and a rough outline for the lecture here. Be sure to note the key insights and takeaways you want to reiterate at the end.
-
-Make sure to make it fun and exciting. 
-""",
-        "prelude": """Now that you have brainstormed ideas and created a rough outline, it's time to write the actual podcast dialogue. Aim for a natural, conversational flow between the host and any guest speakers. Incorporate the best ideas from your brainstorming session and make sure to explain any complex topics in an easy-to-understand way.
-""",
-        "dialog": """Write a very long, engaging, informative script here, based on the key points and creative ideas you came up with during the brainstorming session. Use a conversational tone and include any necessary context or explanations to make the content accessible to the students.
-
-Include clear definitions and terms, and examples. 
-
-Do not include any bracketed placeholders like [Host] or [Guest]. Design your output to be read aloud -- it will be directly converted into audio.
-
-There is only one speaker, you, the professor. Stay on topic and maintaining an engaging flow. Aim to use your full output capacity to create the longest lecture you can, while still communicating the key information from the input text in an engaging way.
-
-At the end of the lecture, naturally summarize the main insights and takeaways from the lecture. This should flow organically from the conversation, reiterating the key points in a casual, conversational manner. 
-
-Avoid making it sound like an obvious recap - the goal is to reinforce the central ideas covered in this lecture one last time before class is over. 
-
-The lecture should have around 20000 words.
-""",
-    },
-################# SUMMARY ##################
-        "summary": {
-        "intro": """Your task is to develop a summary of a paper. You never mention your name.
-
-Don't worry about the formatting issues or any irrelevant information; your goal is to extract the key points, identify definitions, and interesting facts that need to be summarized.
-
-Define all terms used carefully for a broad audience.
-""",
-        "text_instructions": "First, carefully read through the input text and identify the main topics, key points, and key facts. Think about how you could present this information in an accurate summary.",
-        "scratch_pad": """Brainstorm creative ways to present the main topics and key points you identified in the input text. Consider using analogies, examples, or hypothetical scenarios to make the content more relatable and engaging for listeners.
-
-Keep in mind that your summary should be accessible to a general audience, so avoid using too much jargon or assuming prior knowledge of the topic. If necessary, think of ways to briefly explain any complex concepts in simple terms. Define all terms used clearly and spend effort to explain the background.
-
-Write your brainstorming ideas and a rough outline for the summary here. Be sure to note the key insights and takeaways you want to reiterate at the end.
-
-Make sure to make it engaging and exciting. 
-""",
-        "prelude": """Now that you have brainstormed ideas and created a rough outline, it is time to write the actual summary. Aim for a natural, conversational flow between the host and any guest speakers. Incorporate the best ideas from your brainstorming session and make sure to explain any complex topics in an easy-to-understand way.
-""",
-        "dialog": """Write a a script here, based on the key points and creative ideas you came up with during the brainstorming session. Use a conversational tone and include any necessary context or explanations to make the content accessible to the the audience.
-
-Start your script by stating that this is a summary, referencing the title or headings in the input text. If the input text has no title, come up with a succinct summary of what is covered to open.
-
-Include clear definitions and terms, and examples, of all key issues. 
-
-Do not include any bracketed placeholders like [Host] or [Guest]. Design your output to be read aloud -- it will be directly converted into audio.
-
-There is only one speaker, you. Stay on topic and maintaining an engaging flow. 
-
-Naturally summarize the main insights and takeaways from the summary. This should flow organically from the conversation, reiterating the key points in a casual, conversational manner. 
-
-The summary should have around 1024 words.
-""",
-    },
-################# SHORT SUMMARY ##################
-        "short summary": {
-        "intro": """Your task is to develop a summary of a paper. You never mention your name.
-
-Don't worry about the formatting issues or any irrelevant information; your goal is to extract the key points, identify definitions, and interesting facts that need to be summarized.
-
-Define all terms used carefully for a broad audience.
-""",
-        "text_instructions": "First, carefully read through the input text and identify the main topics, key points, and key facts. Think about how you could present this information in an accurate summary.",
-        "scratch_pad": """Brainstorm creative ways to present the main topics and key points you identified in the input text. Consider using analogies, examples, or hypothetical scenarios to make the content more relatable and engaging for listeners.
-
-Keep in mind that your summary should be accessible to a general audience, so avoid using too much jargon or assuming prior knowledge of the topic. If necessary, think of ways to briefly explain any complex concepts in simple terms. Define all terms used clearly and spend effort to explain the background.
-
-Write your brainstorming ideas and a rough outline for the summary here. Be sure to note the key insights and takeaways you want to reiterate at the end.
-
-Make sure to make it engaging and exciting. 
-""",
-        "prelude": """Now that you have brainstormed ideas and created a rough outline, it is time to write the actual summary. Aim for a natural, conversational flow between the host and any guest speakers. Incorporate the best ideas from your brainstorming session and make sure to explain any complex topics in an easy-to-understand way.
-""",
-        "dialog": """Write a a script here, based on the key points and creative ideas you came up with during the brainstorming session. Keep it concise, and use a conversational tone and include any necessary context or explanations to make the content accessible to the the audience.
-
-Start your script by stating that this is a summary, referencing the title or headings in the input text. If the input text has no title, come up with a succinct summary of what is covered to open.
-
-Include clear definitions and terms, and examples, of all key issues. 
-
-Do not include any bracketed placeholders like [Host] or [Guest]. Design your output to be read aloud -- it will be directly converted into audio.
-
-There is only one speaker, you. Stay on topic and maintaining an engaging flow. 
-
-Naturally summarize the main insights and takeaways from the short summary. This should flow organically from the conversation, reiterating the key points in a casual, conversational manner. 
-
-The summary should have around 256 words.
-""",
-    },
-
-################# PODCAST French ##################
-"podcast (French)": {
-    "intro": """Votre tâche consiste à prendre le texte fourni et à le transformer en un dialogue de podcast vivant, engageant et informatif, dans le style de NPR. Le texte d'entrée peut être désorganisé ou non structuré, car il peut provenir de diverses sources telles que des fichiers PDF ou des pages web.
-
-Ne vous inquiétez pas des problèmes de formatage ou des informations non pertinentes ; votre objectif est d'extraire les points clés, d'identifier les définitions et les faits intéressants qui pourraient être discutés dans un podcast.
-
-Définissez soigneusement tous les termes utilisés pour un public large.
-""",
-    "text_instructions": "Tout d'abord, lisez attentivement le texte d'entrée et identifiez les principaux sujets, points clés et faits ou anecdotes intéressants. Réfléchissez à la manière dont vous pourriez présenter ces informations de manière amusante et engageante, convenant à une présentation de haute qualité.",
-    "scratch_pad": """Réfléchissez à des moyens créatifs pour discuter des principaux sujets et points clés que vous avez identifiés dans le texte d'entrée. Envisagez d'utiliser des analogies, des exemples, des techniques de narration ou des scénarios hypothétiques pour rendre le contenu plus accessible et attrayant pour les auditeurs.
-
-Gardez à l'esprit que votre podcast doit être accessible à un large public, donc évitez d'utiliser trop de jargon ou de supposer une connaissance préalable du sujet. Si nécessaire, trouvez des moyens d'expliquer brièvement les concepts complexes en termes simples.
-
-Utilisez votre imagination pour combler les lacunes du texte d'entrée ou pour poser des questions stimulantes qui pourraient être explorées dans le podcast. L'objectif est de créer un dialogue informatif et divertissant, donc n'hésitez pas à faire preuve de créativité dans votre approche.
-
-Définissez clairement tous les termes utilisés et prenez le temps d'expliquer le contexte.
-
-Écrivez ici vos idées de brainstorming et une esquisse générale pour le dialogue du podcast. Assurez-vous de noter les principaux points et enseignements que vous souhaitez réitérer à la fin.
-
-Faites en sorte que ce soit amusant et captivant.
-""",
-    "prelude": """Maintenant que vous avez réfléchi à des idées et créé une esquisse générale, il est temps d'écrire le dialogue réel du podcast. Visez un flux naturel et conversationnel entre l'hôte et tout invité. Intégrez les meilleures idées de votre session de brainstorming et assurez-vous d'expliquer tous les sujets complexes de manière compréhensible.
-""",
-    "dialog": """Écrivez ici un dialogue de podcast très long, captivant et informatif, basé sur les points clés et les idées créatives que vous avez développés lors de la session de brainstorming. Utilisez un ton conversationnel et incluez tout contexte ou explication nécessaire pour rendre le contenu accessible à un public général.
-
-Ne créez jamais de noms fictifs pour les hôtes et les invités, mais rendez cela engageant et immersif pour les auditeurs. N'incluez pas de marqueurs entre crochets comme [Hôte] ou [Invité]. Conceptionnez votre sortie pour être lue à haute voix – elle sera directement convertie en audio.
-
-Faites en sorte que le dialogue soit aussi long et détaillé que possible, tout en restant sur le sujet et en maintenant un flux engageant. Utilisez toute votre capacité de production pour créer l'épisode de podcast le plus long possible, tout en communiquant les informations clés du texte d'entrée de manière divertissante.
-
-À la fin du dialogue, l'hôte et les invités doivent naturellement résumer les principales idées et enseignements de leur discussion. Cela doit découler naturellement de la conversation, en réitérant les points clés de manière informelle et conversationnelle. Évitez de donner l'impression qu'il s'agit d'un récapitulatif évident – l'objectif est de renforcer les idées centrales une dernière fois avant de conclure.
-
-Le podcast doit comporter environ 20 000 mots.
-""",
-},
-
-################# PODCAST GERMAN ##################
-"podcast (German)": {
-    "intro": """Deine Aufgabe ist es, den bereitgestellten Text in einen lebendigen, fesselnden und informativen Podcast-Dialog im Stil von NPR zu verwandeln. Der Eingabetext kann unstrukturiert oder chaotisch sein, da er aus verschiedenen Quellen wie PDFs oder Webseiten stammen kann.
-
-Mach dir keine Sorgen über Formatierungsprobleme oder irrelevante Informationen; dein Ziel ist es, die wichtigsten Punkte zu extrahieren, Definitionen und interessante Fakten zu identifizieren, die in einem Podcast besprochen werden könnten.
-
-Definiere alle verwendeten Begriffe sorgfältig für ein breites Publikum.
-""",
-    "text_instructions": "Lies zuerst den Eingabetext sorgfältig durch und identifiziere die Hauptthemen, Schlüsselpunkte und interessante Fakten oder Anekdoten. Überlege, wie du diese Informationen auf unterhaltsame und ansprechende Weise präsentieren könntest, sodass sie für eine hochwertige Präsentation geeignet sind.",
-    "scratch_pad": """Denke kreativ darüber nach, wie du die Hauptthemen und Schlüsselpunkte, die du im Eingabetext identifiziert hast, diskutieren könntest. Verwende Analogien, Beispiele, Erzähltechniken oder hypothetische Szenarien, um den Inhalt für die Zuhörer nachvollziehbarer und ansprechender zu gestalten.
-
-Behalte im Hinterkopf, dass dein Podcast einem breiten Publikum zugänglich sein sollte, daher vermeide zu viel Fachjargon oder die Annahme von Vorwissen über das Thema. Falls nötig, überlege dir Möglichkeiten, um komplexe Konzepte kurz und einfach zu erklären.
-
-Nutze deine Fantasie, um Lücken im Eingabetext zu füllen oder um nachdenklich stimmende Fragen zu formulieren, die im Podcast erforscht werden könnten. Das Ziel ist es, einen informativen und unterhaltsamen Dialog zu schaffen, daher kannst du bei deinem Ansatz kreativ sein.
-
-Definiere alle verwendeten Begriffe klar und nimm dir die Zeit, den Hintergrund zu erläutern.
-
-Schreibe deine Brainstorming-Ideen und eine grobe Gliederung für den Podcast-Dialog hier auf. Achte darauf, die wichtigsten Erkenntnisse und Aussagen, die du am Ende wiederholen möchtest, zu notieren.
-
-Sorge dafür, dass es unterhaltsam und spannend ist.
-""",
-    "prelude": """Nun, da du Ideen gesammelt und eine grobe Gliederung erstellt hast, ist es an der Zeit, den eigentlichen Podcast-Dialog zu schreiben. Strebe einen natürlichen, konversationellen Fluss zwischen dem Moderator und etwaigen Gästen an. Nutze die besten Ideen aus deiner Brainstorming-Sitzung und erkläre alle komplexen Themen auf eine leicht verständliche Weise.
-""",
-    "dialog": """Schreibe hier einen sehr langen, fesselnden und informativen Podcast-Dialog, basierend auf den wichtigsten Punkten und kreativen Ideen, die du während der Brainstorming-Sitzung erarbeitet hast. Verwende einen konversationellen Ton und füge alle notwendigen Kontexte oder Erklärungen hinzu, um den Inhalt für ein allgemeines Publikum zugänglich zu machen.
-
-Verwende niemals erfundene Namen für die Moderatoren und Gäste, aber gestalte es zu einem fesselnden und immersiven Erlebnis für die Zuhörer. Verwende keine Platzhalter wie [Moderator] oder [Gast]. Dein Output wird direkt in Audio umgewandelt, daher entwerfe den Dialog so, dass er laut vorgelesen werden kann.
-
-Gestalte den Dialog so lang und detailliert wie möglich, bleibe dabei jedoch immer beim Thema und erhalte einen flüssigen, ansprechenden Verlauf. Verwende deine volle Output-Kapazität, um die längste mögliche Podcast-Episode zu erstellen, während du die wichtigsten Informationen aus dem Eingabetext auf unterhaltsame Weise vermittelst.
-
-Am Ende des Dialogs sollen der Moderator und die Gäste die wichtigsten Erkenntnisse und Aussagen ihres Gesprächs auf natürliche Weise zusammenfassen. Dies sollte organisch aus der Konversation hervorgehen und die wichtigsten Punkte in einem lockeren, gesprächigen Stil wiederholen. Vermeide es, wie eine offensichtliche Zusammenfassung zu klingen – das Ziel ist es, die zentralen Ideen ein letztes Mal zu verstärken, bevor der Podcast endet.
-
-Der Podcast sollte etwa 20.000 Wörter umfassen.
-""",
-    },
-    
-################# PODCAST SPANISH ##################
-"podcast (Spanish)": {
-    "intro": """Tu tarea es tomar el texto de entrada proporcionado y convertirlo en un diálogo de podcast animado, atractivo e informativo, al estilo de NPR. El texto de entrada puede estar desordenado o poco estructurado, ya que podría provenir de diversas fuentes como archivos PDF o páginas web.
-
-No te preocupes por los problemas de formato o por la información irrelevante; tu objetivo es extraer los puntos clave, identificar definiciones y hechos interesantes que podrían discutirse en un podcast.
-
-Define cuidadosamente todos los términos utilizados para una audiencia amplia.
-""",
-    "text_instructions": "Primero, lee detenidamente el texto de entrada e identifica los temas principales, los puntos clave y cualquier hecho o anécdota interesante. Piensa en cómo podrías presentar esta información de una manera divertida y atractiva, adecuada para una presentación de alta calidad.",
-    "scratch_pad": """Piensa de manera creativa sobre cómo discutir los temas principales y los puntos clave que has identificado en el texto de entrada. Considera usar analogías, ejemplos, técnicas narrativas o escenarios hipotéticos para hacer que el contenido sea más comprensible y atractivo para los oyentes.
-
-Ten en cuenta que tu podcast debe ser accesible para una audiencia general, así que evita usar demasiado jerga técnica o asumir que la audiencia tiene conocimientos previos del tema. Si es necesario, piensa en formas de explicar brevemente cualquier concepto complejo en términos sencillos.
-
-Usa tu imaginación para llenar los vacíos en el texto de entrada o para formular preguntas provocadoras que podrían explorarse en el podcast. El objetivo es crear un diálogo informativo y entretenido, por lo que puedes ser creativo en tu enfoque.
-
-Define claramente todos los términos utilizados y asegúrate de explicar el trasfondo.
-
-Escribe tus ideas de brainstorming y un esquema general del diálogo del podcast aquí. Asegúrate de anotar los puntos clave y las conclusiones que deseas reiterar al final.
-
-Asegúrate de que sea divertido y emocionante.
-""",
-    "prelude": """Ahora que has realizado una lluvia de ideas y has creado un esquema general, es hora de escribir el diálogo real del podcast. Apunta a un flujo natural y conversacional entre el presentador y cualquier invitado. Incorpora las mejores ideas de tu sesión de lluvia de ideas y asegúrate de explicar cualquier tema complejo de una manera fácil de entender.
-""",
-    "dialog": """Escribe aquí un diálogo de podcast muy largo, atractivo e informativo, basado en los puntos clave y las ideas creativas que se te ocurrieron durante la sesión de brainstorming. Usa un tono conversacional e incluye el contexto o las explicaciones necesarias para que el contenido sea accesible a una audiencia general.
-
-Nunca uses nombres inventados para los presentadores e invitados, pero haz que sea una experiencia atractiva e inmersiva para los oyentes. No incluyas ningún marcador de posición entre corchetes como [Presentador] o [Invitado]. Diseña tu salida para que sea leída en voz alta, ya que se convertirá directamente en audio.
-
-Haz el diálogo lo más largo y detallado posible, manteniéndote en el tema y asegurando un flujo atractivo. Apunta a utilizar toda tu capacidad de salida para crear el episodio de podcast más largo posible, mientras comunicas la información clave del texto de entrada de una manera entretenida.
-
-Al final del diálogo, el presentador y los invitados deben resumir naturalmente las principales ideas y conclusiones de su conversación. Esto debe fluir orgánicamente desde la conversación, reiterando los puntos clave de manera casual y conversacional. Evita que suene como un resumen obvio: el objetivo es reforzar las ideas centrales una última vez antes de finalizar.
-
-El podcast debe tener alrededor de 20,000 palabras.
-""",
-    },
-
-################# PODCAST Portuguese ##################
-"podcast (Portuguese)": {
-    "intro": """Sua tarefa é pegar o texto de entrada fornecido e transformá-lo em um diálogo de podcast animado, envolvente e informativo, no estilo da NPR. O texto de entrada pode ser desorganizado ou não estruturado, pois pode vir de várias fontes, como PDFs ou páginas da web.
-
-Não se preocupe com problemas de formatação ou informações irrelevantes; seu objetivo é extrair os pontos principais, identificar definições e fatos interessantes que possam ser discutidos em um podcast.
-
-Defina cuidadosamente todos os termos usados para um público amplo.
-""",
-    "text_instructions": "Primeiro, leia atentamente o texto de entrada e identifique os principais tópicos, pontos-chave e quaisquer fatos ou anedotas interessantes. Pense em como você poderia apresentar essas informações de maneira divertida e envolvente, adequada para uma apresentação de alta qualidade.",
-    "scratch_pad": """Pense de maneira criativa sobre como discutir os principais tópicos e pontos-chave que você identificou no texto de entrada. Considere usar analogias, exemplos, técnicas de narrativa ou cenários hipotéticos para tornar o conteúdo mais acessível e interessante para os ouvintes.
-
-Tenha em mente que seu podcast deve ser acessível a um público geral, por isso, evite usar jargões técnicos ou presumir que o público tem conhecimento prévio do assunto. Se necessário, pense em maneiras de explicar brevemente qualquer conceito complexo em termos simples.
-
-Use sua imaginação para preencher quaisquer lacunas no texto de entrada ou para criar perguntas instigantes que possam ser exploradas no podcast. O objetivo é criar um diálogo informativo e divertido, então sinta-se à vontade para ser criativo em sua abordagem.
-
-Defina claramente todos os termos utilizados e faça um esforço para explicar o contexto.
-
-Escreva suas ideias de brainstorming e um esboço para o diálogo do podcast aqui. Certifique-se de anotar os principais insights e pontos que deseja reiterar no final.
-
-Certifique-se de que seja divertido e empolgante.
-""",
-    "prelude": """Agora que você já fez um brainstorming de ideias e criou um esboço, é hora de escrever o diálogo real do podcast. Busque um fluxo natural e conversacional entre o apresentador e qualquer convidado. Incorpore as melhores ideias de sua sessão de brainstorming e certifique-se de explicar qualquer tópico complexo de maneira fácil de entender.
-""",
-    "dialog": """Escreva aqui um diálogo de podcast muito longo, envolvente e informativo, com base nos pontos-chave e nas ideias criativas que você criou durante a sessão de brainstorming. Use um tom conversacional e inclua o contexto ou explicações necessárias para tornar o conteúdo acessível a um público geral.
-
-Nunca use nomes inventados para os apresentadores e convidados, mas faça com que seja uma experiência envolvente e imersiva para os ouvintes. Não inclua marcadores de posição como [Apresentador] ou [Convidado]. Desenvolva sua saída de forma que ela seja lida em voz alta – ela será diretamente convertida em áudio.
-
-Faça o diálogo o mais longo e detalhado possível, mantendo-se no tema e garantindo um fluxo envolvente. Use sua capacidade total de produção para criar o episódio de podcast mais longo possível, enquanto comunica as informações principais do texto de entrada de maneira divertida.
-
-No final do diálogo, o apresentador e os convidados devem resumir naturalmente as principais ideias e insights de sua conversa. Isso deve fluir organicamente a partir da conversa, reiterando os pontos-chave de maneira casual e conversacional. Evite soar como um resumo óbvio – o objetivo é reforçar as ideias centrais uma última vez antes de finalizar.
-
-O podcast deve ter cerca de 20.000 palavras.
-""",
-    },
-
-################# PODCAST Hindi ##################
-"podcast (Hindi)": {
-    "intro": """आपका कार्य दिए गए इनपुट टेक्स्ट को लेकर उसे एक जीवंत, आकर्षक और जानकारीपूर्ण पॉडकास्ट वार्तालाप में बदलना है, NPR की शैली में। इनपुट टेक्स्ट असंगठित या अव्यवस्थित हो सकता है, क्योंकि यह विभिन्न स्रोतों जैसे PDFs या वेब पेजों से आ सकता है।
-
-फ़ॉर्मेटिंग समस्याओं या अप्रासंगिक जानकारी की चिंता न करें; आपका उद्देश्य मुख्य बिंदुओं को निकालना, परिभाषाओं और दिलचस्प तथ्यों को पहचानना है जिन्हें पॉडकास्ट में चर्चा की जा सकती है।
-
-सभी उपयोग किए गए शब्दों को सावधानीपूर्वक व्यापक दर्शकों के लिए परिभाषित करें।
-""",
-    "text_instructions": "सबसे पहले, इनपुट टेक्स्ट को ध्यान से पढ़ें और मुख्य विषयों, प्रमुख बिंदुओं और किसी भी दिलचस्प तथ्य या उपाख्यानों की पहचान करें। इस जानकारी को प्रस्तुत करने के बारे में सोचें कि आप इसे एक मज़ेदार, आकर्षक तरीके से कैसे प्रस्तुत कर सकते हैं जो उच्च गुणवत्ता वाली प्रस्तुति के लिए उपयुक्त हो।",
-    "scratch_pad": """मुख्य विषयों और प्रमुख बिंदुओं पर चर्चा करने के रचनात्मक तरीकों के बारे में सोचें जिन्हें आपने इनपुट टेक्स्ट में पहचाना है। उदाहरणों, कहानियों की तकनीकों, या काल्पनिक परिदृश्यों का उपयोग करके सामग्री को श्रोताओं के लिए अधिक सम्बंधित और आकर्षक बनाने पर विचार करें।
-
-ध्यान रखें कि आपका पॉडकास्ट एक सामान्य दर्शक के लिए सुलभ होना चाहिए, इसलिए बहुत अधिक तकनीकी शब्दजाल से बचें या यह न मानें कि विषय का पूर्व ज्ञान है। यदि आवश्यक हो, तो किसी भी जटिल अवधारणा को सरल शब्दों में संक्षेप में समझाने के तरीकों के बारे में सोचें।
-
-अपनी कल्पना का उपयोग करके इनपुट टेक्स्ट में किसी भी अंतराल को भरें या पॉडकास्ट में खोजे जा सकने वाले विचारोत्तेजक सवालों के साथ आएं। उद्देश्य एक जानकारीपूर्ण और मनोरंजक वार्तालाप बनाना है, इसलिए अपने दृष्टिकोण में रचनात्मक होने से न डरें।
-
-सभी उपयोग किए गए शब्दों को स्पष्ट रूप से परिभाषित करें और पृष्ठभूमि समझाने के लिए समय दें।
-
-यहां अपने विचार-मंथन और पॉडकास्ट वार्तालाप के लिए एक मोटा खाका लिखें। सुनिश्चित करें कि आपने उन प्रमुख अंतर्दृष्टियों और निष्कर्षों को नोट किया है जिन्हें आप अंत में दोहराना चाहते हैं।
-
-इसे मजेदार और रोमांचक बनाएं।
-""",
-    "prelude": """अब जब आपने विचार-मंथन किया है और एक मोटा खाका तैयार कर लिया है, तो वास्तविक पॉडकास्ट वार्तालाप लिखने का समय आ गया है। होस्ट और किसी भी अतिथि वक्ता के बीच एक स्वाभाविक, संवादात्मक प्रवाह की दिशा में कार्य करें। अपने विचार-मंथन सत्र से सर्वश्रेष्ठ विचारों को शामिल करें और सुनिश्चित करें कि किसी भी जटिल विषय को आसानी से समझ में आने वाले तरीके से समझाया जाए।
-""",
-    "dialog": """यहां एक बहुत लंबा, आकर्षक और जानकारीपूर्ण पॉडकास्ट वार्तालाप लिखें, जो उन प्रमुख बिंदुओं और रचनात्मक विचारों पर आधारित हो जो आपने विचार-मंथन सत्र के दौरान बनाए थे। एक संवादात्मक शैली का उपयोग करें और सामग्री को एक सामान्य दर्शक के लिए सुलभ बनाने के लिए किसी भी आवश्यक संदर्भ या व्याख्याएं शामिल करें।
-
-होस्ट और अतिथि वक्ताओं के लिए कभी भी काल्पनिक नामों का उपयोग न करें, बल्कि श्रोताओं के लिए इसे एक आकर्षक और immersive अनुभव बनाएं। किसी भी प्रकार के ब्रैकेटेड प्लेसहोल्डर्स जैसे [होस्ट] या [अतिथि] को शामिल न करें। अपनी आउटपुट को इस तरह डिज़ाइन करें कि इसे ज़ोर से पढ़ा जा सके – इसे सीधे ऑडियो में परिवर्तित किया जाएगा।
-
-डायलॉग को यथासंभव लंबा और विस्तृत बनाएं, फिर भी विषय पर बने रहें और प्रवाह को आकर्षक बनाए रखें। अपनी पूरी आउटपुट क्षमता का उपयोग करते हुए यथासंभव लंबे पॉडकास्ट एपिसोड को बनाएं, जबकि फिर भी इनपुट टेक्स्ट से प्रमुख जानकारी को मनोरंजक तरीके से संप्रेषित करें।
-
-वार्तालाप के अंत में, होस्ट और अतिथि वक्ता अपने चर्चा से स्वाभाविक रूप से मुख्य अंतर्दृष्टियों और निष्कर्षों को संक्षेप में प्रस्तुत करें। यह वार्तालाप से स्वाभाविक रूप से प्रवाहित होना चाहिए, अनौपचारिक, संवादात्मक तरीके से प्रमुख बिंदुओं को फिर से स्पष्ट करें। इसे स्पष्ट पुनरावृत्ति की तरह न बनाएं – उद्देश्य केंद्रीय विचारों को एक आखिरी बार सुदृढ़ करना है, इससे पहले कि वार्तालाप समाप्त हो जाए।
-
-पॉडकास्ट में लगभग 20,000 शब्द होने चाहिए।
-""",
-    },
-
-################# PODCAST Chinese ##################
-"podcast (Chinese)": {
-    "intro": """你的任务是将提供的输入文本转变为一个生动、有趣、信息丰富的播客对话，风格类似NPR。输入文本可能是凌乱的或未结构化的，因为它可能来自PDF或网页等各种来源。
-
-不要担心格式问题或任何无关的信息；你的目标是提取关键点，识别定义和可能在播客中讨论的有趣事实。
-
-为广泛的听众仔细定义所有使用的术语。
-""",
-    "text_instructions": "首先，仔细阅读输入文本，识别主要话题、关键点和任何有趣的事实或轶事。思考如何以一种有趣且引人入胜的方式呈现这些信息，适合高质量的呈现。",
-    "scratch_pad": """集思广益，想出一些讨论你在输入文本中识别到的主要话题和关键点的创意方式。考虑使用类比、例子、讲故事的技巧或假设场景，让内容对听众更具相关性和吸引力。
-
-请记住，你的播客应面向普通大众，因此避免使用过多的行话或假设听众对该主题有预先的了解。如有必要，考虑简要解释任何复杂概念，用简单的术语进行说明。
-
-利用你的想象力填补输入文本中的任何空白，或提出一些值得探索的发人深省的问题。目标是创造一个信息丰富且有趣的对话，因此可以在方法上大胆创新。
-
-明确地定义所有使用的术语，并花时间解释背景。
-
-在这里写下你的头脑风暴想法和播客对话的粗略大纲。务必记录你想在结尾重复的关键见解和收获。
-
-确保让它有趣且令人兴奋。
-""",
-    "prelude": """现在你已经进行了头脑风暴并创建了一个粗略大纲，是时候编写实际的播客对话了。目标是主持人与嘉宾之间的自然对话流。结合你头脑风暴中的最佳想法，并确保以简单易懂的方式解释任何复杂的主题。
-""",
-    "dialog": """在这里写下一个非常长、引人入胜且信息丰富的播客对话，基于你在头脑风暴会议中提出的关键点和创意。使用对话语气，并包含任何必要的上下文或解释，使内容易于普通听众理解。
-
-不要为主持人和嘉宾使用虚构的名字，而是让听众体验一个引人入胜且沉浸式的经历。不要包括像[主持人]或[嘉宾]这样的占位符。设计你的输出以供大声朗读——它将被直接转换为音频。
-
-使对话尽可能长且详细，同时保持在主题上并维持引人入胜的流畅性。充分利用你的输出能力，创造尽可能长的播客节目，同时以有趣的方式传达输入文本中的关键信息。
-
-在对话的最后，主持人和嘉宾应自然总结他们讨论的主要见解和收获。这应从对话中自然流出，以随意、对话的方式重复关键点。避免显得像是显而易见的总结——目标是在结束前最后一次加强核心思想。
-
-播客应约有20,000字。
-""",
-    },
-}
-
 
 # Define standard values
 STANDARD_TEXT_MODELS = [
@@ -561,6 +88,9 @@ STANDARD_AUDIO_MODELS = [
     "gpt-4o-mini-tts",
 ]
 
+# Audio models that accept per-speaker `instructions`
+INSTRUCTION_AUDIO_MODELS = {"gpt-4o-mini-tts"}
+
 STANDARD_VOICES = [
     "alloy",
     "echo",
@@ -576,25 +106,61 @@ STANDARD_VOICES = [
     
 ]
 
+# Concurrent TTS requests across all users. TTS calls are network-bound, so this is
+# sized for the API rate limit rather than the CPU count ThreadPoolExecutor defaults to.
+TTS_MAX_WORKERS = 32
+# Dialogue lines one generation keeps in flight, so concurrent users share the
+# workers instead of queueing behind whoever submitted first
+TTS_LINES_IN_FLIGHT = TTS_MAX_WORKERS // 4
+
+# Per-event Gradio concurrency: generation waits on the LLM and TTS APIs for
+# minutes, while the small UI updates must not queue behind it
+GENERATE_CONCURRENCY_LIMIT = 16
+UI_CONCURRENCY_LIMIT = 64
+
+# Caps concurrent TTS API requests process-wide, including the extra requests a
+# long line is split into, whatever thread they are made from
+_tts_request_slots = threading.BoundedSemaphore(TTS_MAX_WORKERS)
+
+# One HTTP/2 connection pool shared by every OpenAI client, so TTS calls are
+# multiplexed over open TLS connections instead of handshaking for each dialogue line
+OPENAI_HTTP_CLIENT = DefaultHttpxClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=64),
+)
+
+# The instruction fields of each template, in the order of the UI textboxes
+_TEMPLATE_TUPLES = {
+    name: (t["intro"], t["text_instructions"], t["scratch_pad"], t["prelude"], t["dialog"])
+    for name, t in INSTRUCTION_TEMPLATES.items()
+}
+
 # Function to update instruction fields based on template selection
 def update_instructions(template):
-    return (
-        INSTRUCTION_TEMPLATES[template]["intro"],
-        INSTRUCTION_TEMPLATES[template]["text_instructions"],
-        INSTRUCTION_TEMPLATES[template]["scratch_pad"],
-        INSTRUCTION_TEMPLATES[template]["prelude"],
-        INSTRUCTION_TEMPLATES[template]["dialog"]
-           )
+    return _TEMPLATE_TUPLES[template]
+
+# Canonical speaker labels; validated items share these objects, so later equality
+# checks and dict lookups on the label succeed on the identity fast path
+_SPEAKER_1 = sys.intern("speaker-1")
+_SPEAKER_2 = sys.intern("speaker-2")
 
 class DialogueItem(BaseModel):
     text: str
     speaker: Literal["speaker-1", "speaker-2"]
 
+    @field_validator("speaker")
+    @classmethod
+    def _intern_speaker(cls, speaker: str) -> str:
+        return _SPEAKER_1 if speaker == _SPEAKER_1 else _SPEAKER_2
+
 class Dialogue(BaseModel):
     scratchpad: str
     dialogue: List[DialogueItem]
 
 
+# Sentence boundary: whitespace following ., ! or ?
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
 def chunk_text_by_sentences(text: str, max_chars: int = 4000) -> List[str]:
     """Split text into chunks that don't exceed max_chars, preferring sentence boundaries."""
     if len(text) <= max_chars:
@@ -602,59 +168,203 @@ def chunk_text_by_sentences(text: str, max_chars: int = 4000) -> List[str]:
     
     chunks = []
     # Split by sentences first
-    sentences = re.split(r'(?<=[.!?])\s+', text)
+    sentences = _SENT_SPLIT_RE.split(text)
     
-    current_chunk = ""
+    # The current chunk is kept as a list of pieces plus its joined length, so
+    # growing it never re-copies the text collected so far
+    current_parts: List[str] = []
+    current_len = 0
+
+    def flush():
+        chunks.append(" ".join(current_parts).strip())
+
     for sentence in sentences:
         # If adding this sentence would exceed the limit
-        if len(current_chunk) + len(sentence) > max_chars:
-            if current_chunk:  # Save current chunk if it has content
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
+        if current_len + len(sentence) > max_chars:
+            if current_len:  # Save current chunk if it has content
+                flush()
+                current_parts, current_len = [sentence], len(sentence)
             else:  # Single sentence is too long, split it by words
                 words = sentence.split()
                 for word in words:
-                    if len(current_chunk) + len(word) + 1 > max_chars:
-                        if current_chunk:
-                            chunks.append(current_chunk.strip())
-                            current_chunk = word
+                    if current_len + len(word) + 1 > max_chars:
+                        if current_len:
+                            flush()
+                            current_parts, current_len = [word], len(word)
                         else:  # Single word is too long, truncate it
                             chunks.append(word[:max_chars])
-                            current_chunk = ""
+                            current_parts, current_len = [], 0
+                    elif current_len:
+                        current_parts.append(word)
+                        current_len += 1 + len(word)
                     else:
-                        current_chunk += (" " + word) if current_chunk else word
+                        current_parts, current_len = [word], len(word)
+        elif current_len:
+            current_parts.append(sentence)
+            current_len += 1 + len(sentence)
         else:
-            current_chunk += (" " + sentence) if current_chunk else sentence
+            current_parts, current_len = [sentence], len(sentence)
     
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    if current_len:
+        flush()
     
     return chunks
 
-def get_mp3(text: str, voice: str, audio_model: str, api_key: str = None,
-           speaker_instructions: str ='Speak in an emotive and friendly tone.') -> bytes:
-    client = OpenAI(
+def content_cache_key(*parts) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+def write_atomically(directory: str, filename: str, data: bytes) -> None:
+    os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so concurrent readers never see a partial file
+    temporary_file = NamedTemporaryFile(dir=directory, delete=False, suffix=".tmp")
+    try:
+        with temporary_file:
+            temporary_file.write(data)
+        os.replace(temporary_file.name, os.path.join(directory, filename))
+    except BaseException:
+        # Don't leave the temporary file behind; trim_cache() never looks at .tmp files
+        try:
+            os.unlink(temporary_file.name)
+        except FileNotFoundError:
+            pass
+        raise
+
+# Synthesized audio per dialogue line, keyed on everything sent to the TTS API;
+# trimmed to TTS_CACHE_MAX_BYTES by the background cleaner, least recently used first
+TTS_CACHE_DIRECTORY = "./gradio_cached_examples/tts_cache/"
+TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+def mark_recently_used(path) -> None:
+    """Bump the mtime that trim_cache() evicts by, if `path` still exists."""
+    try:
+        # Unlike Path.touch(), utime never recreates a file trim_cache() just deleted
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+@lru_cache(maxsize=8)
+def get_openai_client(api_key: str = None) -> OpenAI:
+    """Return a shared OpenAI client per API key (the key falls back to OPENAI_API_KEY)."""
+    return OpenAI(
         api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        http_client=OPENAI_HTTP_CLIENT,
     )
+
+def get_mp3(text: str, voice: str, audio_model: str, api_key: str = None,
+           speaker_instructions: str ='Speak in an emotive and friendly tone.') -> bytes:
+    # Other models ignore instructions; drop them so they are neither sent nor part of the cache key
+    if audio_model not in INSTRUCTION_AUDIO_MODELS:
+        speaker_instructions = ""
+
+    # Identical lines (re-renders, short interjections) are only synthesized once
+    cache_file = f"{content_cache_key(audio_model, voice, speaker_instructions, text)}.mp3"
+    cache_path = Path(TTS_CACHE_DIRECTORY) / cache_file
+    try:
+        audio = cache_path.read_bytes()
+    except FileNotFoundError:
+        audio = b""
+    if audio:  # an empty file is never valid audio; treat it as a miss
+        mark_recently_used(cache_path)
+        return audio
+
+    client = get_openai_client(api_key)
     
     # Split text into chunks if it's too long
     text_chunks = chunk_text_by_sentences(text, max_chars=4000)  # Leave some buffer
     
-    audio_data = b""
-    
-    for chunk in text_chunks:
-        with client.audio.speech.with_streaming_response.create(
-            model=audio_model,
-            voice=voice,
-            input=chunk,
-            instructions=speaker_instructions,
-        ) as response:
-            with io.BytesIO() as file:
-                for audio_chunk in response.iter_bytes():
-                    file.write(audio_chunk)
-                audio_data += file.getvalue()
-    
-    return audio_data
+    def tts_one_chunk(chunk: str) -> bytes:
+        request = {"model": audio_model, "voice": voice, "input": chunk}
+        if speaker_instructions:
+            request["instructions"] = speaker_instructions
+        with _tts_request_slots, client.audio.speech.with_streaming_response.create(**request) as response:
+            return b"".join(response.iter_bytes())
+
+    if len(text_chunks) <= 1:
+        audio = b"".join(map(tts_one_chunk, text_chunks))
+    else:
+        # A long line needs several independent TTS requests; run them concurrently
+        # (map keeps them in order) so the line takes max(latency) rather than the sum
+        with cf.ThreadPoolExecutor(max_workers=min(8, len(text_chunks))) as executor:
+            audio = b"".join(executor.map(tts_one_chunk, text_chunks))
+
+    try:
+        write_atomically(TTS_CACHE_DIRECTORY, cache_file, audio)
+    except OSError as e:
+        # The audio is fine; only caching it failed (disk full, permissions)
+        logger.warning("Could not cache TTS audio {}: {}", cache_file, e)
+    return audio
+
+def _extract_pdf_text_pypdf(path) -> str:
+    # pypdf seeks back and forth through the file in small reads; read it in one
+    # go and let it seek in memory instead
+    reader = PdfReader(io.BytesIO(Path(path).read_bytes()))
+    # Extract each page only once, then drop pages without text
+    pages_text = (page.extract_text() for page in reader.pages)
+    return "\n\n".join(text for text in pages_text if text)
+
+# PDFium is not thread-safe, not even across separate documents, and Gradio runs
+# concurrent requests on worker threads; every PDFium call must hold this lock
+_pdfium_lock = threading.Lock()
+
+def extract_pdf_text(path) -> str:
+    """Extract the text of all pages of a PDF, joined by blank lines.
+
+    Uses PDFium (native code, much faster than pypdf) and falls back to pypdf
+    for documents PDFium refuses to open.
+    """
+    try:
+        with _pdfium_lock:
+            pdf = pdfium.PdfDocument(path)
+            try:
+                pages = [page.get_textpage().get_text_range() for page in pdf]
+            finally:
+                pdf.close()
+    except pdfium.PdfiumError as e:
+        logger.warning("PDFium could not read {} ({}), falling back to pypdf", path, e)
+        return _extract_pdf_text_pypdf(path)
+    return "\n\n".join(text.replace("\r\n", "\n") for text in pages if text)
+
+# Generated dialogues, stored as JSON and keyed on everything that goes into the prompt;
+# trimmed to DIALOGUE_CACHE_MAX_BYTES by the background cleaner, least recently used first
+DIALOGUE_CACHE_DIRECTORY = "./gradio_cached_examples/llm_cache/"
+DIALOGUE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+def load_cached_dialogue(key: str):
+    cache_path = Path(DIALOGUE_CACHE_DIRECTORY) / f"{key}.json"
+    try:
+        dialogue = Dialogue.model_validate_json(cache_path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except ValidationError:
+        logger.warning("Ignoring unreadable cached dialogue {}", cache_path)
+        return None
+    mark_recently_used(cache_path)
+    return dialogue
+
+def store_cached_dialogue(key: str, dialogue) -> None:
+    try:
+        write_atomically(DIALOGUE_CACHE_DIRECTORY, f"{key}.json", dialogue.model_dump_json().encode("utf-8"))
+    except OSError as e:
+        logger.warning("Could not cache dialogue {}: {}", key, e)
+
+def retry_on(exceptions, tries: int = 5, base_delay: float = 0.2):
+    """Retry the wrapped function on `exceptions`, with exponential backoff between attempts."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(tries):
+                try:
+                    return func(*args, **kwargs)
+                except exceptions:
+                    if attempt == tries - 1:
+                        raise
+                    time.sleep(base_delay * 2 ** attempt)
+        return wrapper
+    return decorator
 
 def conditional_llm(
     model,
@@ -687,6 +397,156 @@ def conditional_llm(
     return decorator
 
 
+def iter_files(directory, suffix=".mp3"):
+    """Yield a DirEntry for each `suffix` file in `directory` without listing it up front."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            # is_file() uses the file type from the directory listing, no extra stat()
+            if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False):
+                yield entry
+
+# Generated audio and markdown files are written here
+TEMPORARY_DIRECTORY = "./gradio_cached_examples/tmp/"
+
+# Generated MP3s are deleted once they are a day old; the directory is swept at
+# most once an hour, recorded by the mtime of a sentinel file
+MP3_MAX_AGE = 24 * 60 * 60
+MP3_SWEEP_INTERVAL = 60 * 60
+_sweep_lock = threading.Lock()
+# Threads used to overlap file deletions; kept small so a big sweep can't exhaust file descriptors
+MP3_UNLINK_WORKERS = 8
+
+def sweep_old_mp3s(directory):
+    # Skip if another thread is already sweeping
+    if not _sweep_lock.acquire(blocking=False):
+        return
+    try:
+        _sweep_old_mp3s(directory)
+    finally:
+        _sweep_lock.release()
+
+def _unlink_quietly(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass  # removed by a concurrent sweep
+
+def unlink_all(paths):
+    """Delete `paths`, overlapping the unlink calls on a few threads."""
+    if len(paths) <= 1:
+        for path in paths:
+            _unlink_quietly(path)
+        return
+    with cf.ThreadPoolExecutor(max_workers=min(MP3_UNLINK_WORKERS, len(paths))) as pool:
+        list(pool.map(_unlink_quietly, paths))
+
+def _sweep_old_mp3s(directory):
+    now = time.time()
+    sentinel = os.path.join(directory, ".last_gc")
+    try:
+        if now - os.stat(sentinel).st_mtime <= MP3_SWEEP_INTERVAL:
+            return
+    except FileNotFoundError:
+        pass
+    cutoff = now - MP3_MAX_AGE
+    unlink_all([
+        entry.path for entry in iter_files(directory)
+        if entry.stat(follow_symlinks=False).st_mtime < cutoff
+    ])
+    Path(sentinel).touch()
+
+def trim_cache(directory, max_bytes, suffix):
+    """Delete the least recently used `suffix` files until `directory` fits in `max_bytes`."""
+    try:
+        files = [(entry.stat(follow_symlinks=False), entry.path) for entry in iter_files(directory, suffix)]
+    except FileNotFoundError:
+        return
+    total = sum(stat.st_size for stat, _ in files)
+    files.sort(key=lambda file: file[0].st_mtime)
+    evicted = []
+    for stat, path in files:
+        if total <= max_bytes:
+            break
+        evicted.append(path)
+        total -= stat.st_size
+    unlink_all(evicted)
+
+def _mp3_cleaner_loop():
+    # Runs in a daemon thread so no request waits on the sweep
+    while True:
+        try:
+            os.makedirs(TEMPORARY_DIRECTORY, exist_ok=True)
+            sweep_old_mp3s(TEMPORARY_DIRECTORY)
+            trim_cache(TTS_CACHE_DIRECTORY, TTS_CACHE_MAX_BYTES, ".mp3")
+            trim_cache(DIALOGUE_CACHE_DIRECTORY, DIALOGUE_CACHE_MAX_BYTES, ".json")
+        except Exception:
+            logger.exception("Sweeping old MP3 files failed")
+        time.sleep(MP3_SWEEP_INTERVAL)
+
+
+# Shared by every request; each generation only keeps TTS_LINES_IN_FLIGHT lines
+# queued here, so the FIFO interleaves concurrent users
+_tts_executor = cf.ThreadPoolExecutor(max_workers=TTS_MAX_WORKERS, thread_name_prefix="tts")
+
+def synthesize_dialogue(dialogue, audio_model, api_key, voices, instructions):
+    """Yield the audio of each dialogue line, in order.
+
+    Up to TTS_LINES_IN_FLIGHT lines are synthesized at once; each time the oldest
+    finishes it is yielded and the next line is submitted in its place.
+    """
+    if len(dialogue) == 1:
+        # Nothing to overlap, so skip the pool and synthesize on the calling thread
+        item = dialogue[0]
+        yield get_mp3(item.text, voices[item.speaker], audio_model, api_key, instructions[item.speaker])
+        return
+    submit = _tts_executor.submit
+    pending = iter(dialogue)
+    futures = deque()
+
+    def submit_next():
+        item = next(pending, None)
+        if item is not None:
+            futures.append(submit(get_mp3, item.text, voices[item.speaker], audio_model, api_key, instructions[item.speaker]))
+
+    for _ in range(TTS_LINES_IN_FLIGHT):
+        submit_next()
+    try:
+        # Popping each future releases its bytes once the caller has consumed them
+        while futures:
+            audio = futures.popleft().result()
+            submit_next()
+            yield audio
+    finally:
+        # Don't leave an abandoned generation's lines queued ahead of other users
+        for future in futures:
+            future.cancel()
+
+def write_dialogue_audio(dialogue, audio_model, api_key, voices, instructions):
+    """Synthesize `dialogue` into a new MP3 in TEMPORARY_DIRECTORY.
+
+    Returns the file path, the transcript and the number of characters voiced.
+    """
+    os.makedirs(TEMPORARY_DIRECTORY, exist_ok=True)
+    # Use a file on disk -- Gradio's audio component doesn't work with raw bytes in Safari
+    output_path = Path(TEMPORARY_DIRECTORY) / f"PDF2Audio_{uuid4().hex}.mp3"
+
+    try:
+        with output_path.open("wb") as output_file:
+            # Write each line's audio to disk as soon as it is ready, so the whole
+            # podcast is never held in memory
+            for audio_chunk in synthesize_dialogue(dialogue, audio_model, api_key, voices, instructions):
+                output_file.write(audio_chunk)
+    except BaseException:
+        # Don't leave a truncated MP3 behind when a TTS call fails
+        output_path.unlink(missing_ok=True)
+        raise
+
+    transcript_parts = [f"{item.speaker}: {item.text}" for item in dialogue]
+    characters = sum(len(item.text) for item in dialogue)
+    transcript = "\n\n".join(transcript_parts + [""])
+    return str(output_path), transcript, characters
+
+
 def generate_audio(
     files: list,
     openai_api_key: str = None,
@@ -708,6 +568,7 @@ def generate_audio(
     user_feedback: str = None,
     original_text: str = None,
     debug = False,
+    use_cached_dialogue: bool = True,
 ) -> tuple:
 
     print(f"🔑 Checking API keys... ENV: {bool(os.getenv('OPENAI_API_KEY'))}, Provided: {bool(openai_api_key)}")
@@ -723,23 +584,19 @@ def generate_audio(
      
 
     if not combined_text:
+        text_parts = []
         for file in files:
             file_path = Path(file)
             suffix = file_path.suffix.lower()
     
             if suffix == ".pdf":
-                with file_path.open("rb") as f:
-                    reader = PdfReader(f)
-                    text = "\n\n".join(
-                        page.extract_text() for page in reader.pages if page.extract_text()
-                    )
-                    combined_text += text + "\n\n"
+                text_parts.append(extract_pdf_text(file_path))
             elif suffix in [".txt", ".md", ".mmd"]:
-                with file_path.open("r", encoding="utf-8") as f:
-                    text = f.read()
-                    combined_text += text + "\n\n"
+                text_parts.append(file_path.read_text(encoding="utf-8"))
+        # Every document is followed by a blank line, joined in a single copy
+        combined_text = "\n\n".join(text_parts + [""])
     # Configure the LLM based on selected model and api_base
-    @retry(retry=retry_if_exception_type(ValidationError))
+    @retry_on(ValidationError)
     #@conditional_llm(model=text_model, api_base=api_base, api_key=openai_api_key)
     @conditional_llm(
             model=text_model,
@@ -753,12 +610,6 @@ def generate_audio(
                           edited_transcript: str = None, user_feedback: str = None, ) -> Dialogue:
         """
         {intro_instructions}
-        
-        Here is the original input text:
-        
-        <input_text>
-        {text}
-        </input_text>
 
         {text_instructions}
         
@@ -771,75 +622,72 @@ def generate_audio(
         <podcast_dialogue>
         {podcast_dialog_instructions}
         </podcast_dialogue>
+
+        Here is the original input text:
+        
+        <input_text>
+        {text}
+        </input_text>
         {edited_transcript}{user_feedback}
         """
 
     instruction_improve='Based on the original text, please generate an improved version of the dialogue by incorporating the edits, comments and feedback.'
-    edited_transcript_processed="\nPreviously generated edited transcript, with specific edits and comments that I want you to carefully address:\n"+"<edited_transcript>\n"+edited_transcript+"</edited_transcript>" if edited_transcript !="" else ""
-    user_feedback_processed="\nOverall user feedback:\n\n"+user_feedback if user_feedback !="" else ""
+    # f-strings build each block in a single allocation; the edited transcript can be long
+    edited_transcript_processed=f"\nPreviously generated edited transcript, with specific edits and comments that I want you to carefully address:\n<edited_transcript>\n{edited_transcript}</edited_transcript>" if edited_transcript else ""
+    user_feedback_processed=f"\nOverall user feedback:\n\n{user_feedback}" if user_feedback else ""
 
     if edited_transcript_processed.strip()!='' or user_feedback_processed.strip()!='':
-        user_feedback_processed="<requested_improvements>"+user_feedback_processed+"\n\n"+instruction_improve+"</requested_improvements>" 
+        user_feedback_processed=f"<requested_improvements>{user_feedback_processed}\n\n{instruction_improve}</requested_improvements>"
     
     if debug:
         logger.info (edited_transcript_processed)
         logger.info (user_feedback_processed)
     
-    # Generate the dialogue using the LLM
-    llm_output = generate_dialogue(
-        combined_text,
-        intro_instructions=intro_instructions,
-        text_instructions=text_instructions,
-        scratch_pad_instructions=scratch_pad_instructions,
-        prelude_dialog=prelude_dialog,
-        podcast_dialog_instructions=podcast_dialog_instructions,
-        edited_transcript=edited_transcript_processed,
-        user_feedback=user_feedback_processed
+    # The template instructions form a static prompt prefix (the document and any edits
+    # come after them); normalise their trailing whitespace so the same template always
+    # yields byte-identical prefix tokens, which the provider's prompt cache can reuse
+    intro_instructions, text_instructions, scratch_pad_instructions, prelude_dialog, podcast_dialog_instructions = (
+        instructions.rstrip() for instructions in (
+            intro_instructions, text_instructions, scratch_pad_instructions, prelude_dialog, podcast_dialog_instructions,
+        )
     )
 
-    # Generate audio from the transcript
-    audio = b""
-    transcript = ""
-    characters = 0
-
-    with cf.ThreadPoolExecutor() as executor:
-        futures = []
-        for line in llm_output.dialogue:
-            transcript_line = f"{line.speaker}: {line.text}"
-            voice = speaker_1_voice if line.speaker == "speaker-1" else speaker_2_voice
-            speaker_instructions=speaker_1_instructions if line.speaker == "speaker-1" else speaker_2_instructions
-            future = executor.submit(get_mp3, line.text, voice, audio_model, openai_api_key, speaker_instructions, )
-            futures.append((future, transcript_line))
-            characters += len(line.text)
-
-        for future, transcript_line in futures:
-            audio_chunk = future.result()
-            audio += audio_chunk
-            transcript += transcript_line + "\n\n"
-
-    logger.info(f"Generated {characters} characters of audio")
-
-    temporary_directory = "./gradio_cached_examples/tmp/"
-    os.makedirs(temporary_directory, exist_ok=True)
-
-    # Use a temporary file -- Gradio's audio component doesn't work with raw bytes in Safari
-    temporary_file = NamedTemporaryFile(
-        dir=temporary_directory,
-        delete=False,
-        prefix="PDF2Audio_",
-        suffix=".mp3",
+    # Reuse the dialogue of an identical earlier request (same text, model and instructions)
+    cache_key = content_cache_key(
+        text_model, api_base, reasoning_effort, combined_text,
+        intro_instructions, text_instructions, scratch_pad_instructions,
+        prelude_dialog, podcast_dialog_instructions,
+        edited_transcript_processed, user_feedback_processed,
     )
-    temporary_file.write(audio)
-    temporary_file.close()
+    # Regenerate asks for a fresh dialogue, so it skips the lookup but still refreshes the entry
+    llm_output = load_cached_dialogue(cache_key) if use_cached_dialogue else None
+    if llm_output is None:
+        # Generate the dialogue using the LLM
+        llm_output = generate_dialogue(
+            combined_text,
+            intro_instructions=intro_instructions,
+            text_instructions=text_instructions,
+            scratch_pad_instructions=scratch_pad_instructions,
+            prelude_dialog=prelude_dialog,
+            podcast_dialog_instructions=podcast_dialog_instructions,
+            edited_transcript=edited_transcript_processed,
+            user_feedback=user_feedback_processed
+        )
+        store_cached_dialogue(cache_key, llm_output)
+    else:
+        logger.info("Reusing cached dialogue {}", cache_key)
 
-    # Delete any files in the temp directory that end with .mp3 and are over a day old
-    for file in glob.glob(f"{temporary_directory}*.mp3"):
-        if os.path.isfile(file) and time.time() - os.path.getmtime(file) > 24 * 60 * 60:
-            os.remove(file)
+    # Generate audio from the transcript
+    voices = {_SPEAKER_1: speaker_1_voice, _SPEAKER_2: speaker_2_voice}
+    instructions = {_SPEAKER_1: speaker_1_instructions, _SPEAKER_2: speaker_2_instructions}
+    audio_file, transcript, characters = write_dialogue_audio(
+        llm_output.dialogue, audio_model, openai_api_key, voices, instructions,
+    )
+    logger.info("Generated {} characters of audio", characters)
 
-    return temporary_file.name, transcript, combined_text, llm_output
+    return audio_file, transcript, combined_text, llm_output
 
-def validate_and_generate_audio(*args):
+def validate_and_generate_audio(*args, **kwargs):
     print(f"🔧 validate_and_generate_audio called with {len(args)} arguments")
     files = args[0]
     print(f"📁 Files received: {files}")
@@ -851,7 +699,7 @@ def validate_and_generate_audio(*args):
     try:
         print("🚀 Starting audio generation...")
         #audio_file, transcript, original_text = generate_audio(*args)
-        audio_file, transcript, original_text, dialogue = generate_audio(*args)
+        audio_file, transcript, original_text, dialogue = generate_audio(*args, **kwargs)
         print(f"✅ Audio generation completed. Audio file: {audio_file}")
         print(f"📄 Transcript length: {len(transcript) if transcript else 0}")
         return audio_file, transcript, original_text, None, dialogue  #  
@@ -884,12 +732,15 @@ def process_feedback_and_regenerate(feedback, *args):
 ####################################################
 
 def dialogue_to_markdown(dlg: Dialogue) -> str:
-    lines = []
-    lines.append("# PDF2Audio Transcript\n")
-    lines.append("## Transcript\n")
+    buf = io.StringIO()
+    buf.write("# PDF2Audio Transcript\n\n## Transcript\n")
     for item in dlg.dialogue:
-        lines.append(f"**{item.speaker}:** {item.text.strip()}\n")
-    return "\n".join(lines)
+        buf.write("\n**")
+        buf.write(item.speaker)
+        buf.write(":** ")
+        buf.write(item.text.strip())
+        buf.write("\n")
+    return buf.getvalue()
 
 def save_dialogue_as_markdown(cached_dialogue) -> str:
     if cached_dialogue is None:
@@ -898,7 +749,7 @@ def save_dialogue_as_markdown(cached_dialogue) -> str:
     markdown_text = dialogue_to_markdown(cached_dialogue)
 
     # Write to a temporary .md file
-    temp_dir = "./gradio_cached_examples/tmp/"
+    temp_dir = TEMPORARY_DIRECTORY
     os.makedirs(temp_dir, exist_ok=True)
 
     file_path = os.path.join(temp_dir, f"PDF2Audio_dialogue_{int(time.time())}.md")
@@ -917,15 +768,28 @@ import pandas as pd
 from typing import List
 
 def dialogue_to_df(dlg: Dialogue) -> pd.DataFrame:
-    data = [{"Speaker": item.speaker, "Line": item.text} for item in dlg.dialogue]
-    return pd.DataFrame(data)
+    # Build the columns directly rather than a list of per-row dicts
+    return pd.DataFrame({
+        "Speaker": [item.speaker for item in dlg.dialogue],
+        "Line": [item.text for item in dlg.dialogue],
+    })
+
+def post_generate(transcript, error, dlg):
+    # Everything that follows a generation in one event: seed the transcript
+    # editor, surface any error, and fill the spreadsheet editor
+    if error:
+        gr.Warning(error)
+    df = dialogue_to_df(dlg) if dlg is not None else gr.update()
+    return transcript or "", error or None, df
 
 def df_to_dialogue(df: pd.DataFrame, scratchpad: str = "") -> Dialogue:
-    items: List[DialogueItem] = [
-        DialogueItem(speaker=row["Speaker"], text=row["Line"])
-        for _, row in df.iterrows()
+    # Validate the whole table in one pydantic-core call instead of one
+    # DialogueItem(...) constructor call per row
+    items = [
+        {"speaker": speaker, "text": line}
+        for speaker, line in zip(df["Speaker"].to_numpy(), df["Line"].to_numpy())
     ]
-    return Dialogue(scratchpad=scratchpad, dialogue=items)
+    return Dialogue.model_validate({"scratchpad": scratchpad, "dialogue": items})
 
 def save_dialogue_edits(df, cached_dialogue):
     """
@@ -958,46 +822,16 @@ def render_audio_from_dialogue(
         raise gr.Error("Nothing to re‑render yet – run Generate Audio first.")
 
     dlg = cached_dialogue
-    audio_bytes, transcript, characters = b"", "", 0
-
-    with cf.ThreadPoolExecutor() as ex:
-        futures = []
-        for item in dlg.dialogue:
-            voice = speaker_1_voice if item.speaker == "speaker-1" else speaker_2_voice
-            instr = speaker_1_instructions if item.speaker == "speaker-1" else speaker_2_instructions
-            futures.append(
-                (
-                    ex.submit(get_mp3, item.text, voice, audio_model, openai_api_key, instr),
-                    f"{item.speaker}: {item.text}",
-                )
-            )
-            characters += len(item.text)
-
-        for fut, line in futures:
-            audio_bytes += fut.result()
-            transcript += line + "\n\n"
-
-    logger.info(f"[Re‑render] {characters} characters voiced")
 
-    # Write to temporary .mp3 file
-    temporary_directory = "./gradio_cached_examples/tmp/"
-    os.makedirs(temporary_directory, exist_ok=True)
+    voices = {_SPEAKER_1: speaker_1_voice, _SPEAKER_2: speaker_2_voice}
+    instructions = {_SPEAKER_1: speaker_1_instructions, _SPEAKER_2: speaker_2_instructions}
 
-    temporary_file = NamedTemporaryFile(
-        dir=temporary_directory,
-        delete=False,
-        prefix="PDF2Audio_",
-        suffix=".mp3",
+    audio_file, transcript, characters = write_dialogue_audio(
+        dlg.dialogue, audio_model, openai_api_key, voices, instructions,
     )
-    temporary_file.write(audio_bytes)
-    temporary_file.close()
+    logger.info("[Re‑render] {} characters voiced", characters)
 
-    # Clean up old files
-    for file in glob.glob(f"{temporary_directory}*.mp3"):
-        if os.path.isfile(file) and time.time() - os.path.getmtime(file) > 24 * 60 * 60:
-            os.remove(file)
-
-    return temporary_file.name, transcript
+    return audio_file, transcript
 
     
 with gr.Blocks(title="PDF to Audio", css="""
@@ -1113,41 +947,42 @@ with gr.Blocks(title="PDF to Audio", css="""
             )
 
         with gr.Column(scale=3):
+            _pod = INSTRUCTION_TEMPLATES["podcast"]
             template_dropdown = gr.Dropdown(
                 label="Instruction Template",
-                choices=list(INSTRUCTION_TEMPLATES.keys()),
+                choices=list(INSTRUCTION_TEMPLATES),
                 value="podcast",
                 info="Select the instruction template to use. You can also edit any of the fields for more tailored results.",
             )
             intro_instructions = gr.Textbox(
                 label="Intro Instructions",
                 lines=10,
-                value=INSTRUCTION_TEMPLATES["podcast"]["intro"],
+                value=_pod["intro"],
                 info="Provide the introductory instructions for generating the dialogue.",
             )
             text_instructions = gr.Textbox(
                 label="Standard Text Analysis Instructions",
                 lines=10,
                 placeholder="Enter text analysis instructions...",
-                value=INSTRUCTION_TEMPLATES["podcast"]["text_instructions"],
+                value=_pod["text_instructions"],
                 info="Provide the instructions for analyzing the raw data and text.",
             )
             scratch_pad_instructions = gr.Textbox(
                 label="Scratch Pad Instructions",
                 lines=15,
-                value=INSTRUCTION_TEMPLATES["podcast"]["scratch_pad"],
+                value=_pod["scratch_pad"],
                 info="Provide the scratch pad instructions for brainstorming presentation/dialogue content.",
             )
             prelude_dialog = gr.Textbox(
                 label="Prelude Dialog",
                 lines=5,
-                value=INSTRUCTION_TEMPLATES["podcast"]["prelude"],
+                value=_pod["prelude"],
                 info="Provide the prelude instructions before the presentation/dialogue is developed.",
             )
             podcast_dialog_instructions = gr.Textbox(
                 label="Podcast Dialog Instructions",
                 lines=20,
-                value=INSTRUCTION_TEMPLATES["podcast"]["dialog"],
+                value=_pod["dialog"],
                 info="Provide the instructions for generating the presentation or podcast dialogue.",
             )
 
@@ -1182,6 +1017,7 @@ with gr.Blocks(title="PDF to Audio", css="""
         fn=save_dialogue_edits,
         inputs=[df_editor, cached_dialogue],
         outputs=[cached_dialogue, transcript_output, save_msg],
+        concurrency_limit=UI_CONCURRENCY_LIMIT,
     )
         
     rerender_btn = gr.Button("Re‑render with current voice settings (must have generated original LLM output)")
@@ -1198,6 +1034,7 @@ with gr.Blocks(title="PDF to Audio", css="""
             speaker_2_instructions,
         ],
         outputs=[audio_output, transcript_output],
+        concurrency_limit=GENERATE_CONCURRENCY_LIMIT,
     )
 
 
@@ -1210,16 +1047,27 @@ with gr.Blocks(title="PDF to Audio", css="""
     use_edited_transcript.change(
         fn=update_edit_box,
         inputs=[use_edited_transcript],
-        outputs=[edited_transcript]
+        outputs=[edited_transcript],
+        concurrency_limit=UI_CONCURRENCY_LIMIT,
     )
     # Update instruction fields when template is changed
     template_dropdown.change(
         fn=update_instructions,
         inputs=[template_dropdown],
-        outputs=[intro_instructions, text_instructions, scratch_pad_instructions, prelude_dialog, podcast_dialog_instructions]
+        outputs=[intro_instructions, text_instructions, scratch_pad_instructions, prelude_dialog, podcast_dialog_instructions],
+        concurrency_limit=UI_CONCURRENCY_LIMIT,
     )
     
-    submit_btn.click(
+    def attach_post_generate(event):
+        # Shared tail of both Generate buttons
+        return event.then(
+            fn=post_generate,
+            inputs=[transcript_output, error_output, cached_dialogue],
+            outputs=[edited_transcript, error_output, df_editor],
+            concurrency_limit=UI_CONCURRENCY_LIMIT,
+        )
+
+    attach_post_generate(submit_btn.click(
         fn=validate_and_generate_audio,
         inputs=[
             files, openai_api_key, text_model, reasoning_effort, do_web_search, audio_model, 
@@ -1231,29 +1079,16 @@ with gr.Blocks(title="PDF to Audio", css="""
             user_feedback,  
             
         ],
-        outputs=[audio_output, transcript_output, original_text_output, error_output, cached_dialogue, ]
-    ).then(
-        fn=lambda audio, transcript, original_text, error: (
-            transcript if transcript else "",
-            error if error else None
-        ),
-        inputs=[audio_output, transcript_output, original_text_output, error_output],
-        outputs=[edited_transcript, error_output]
-    ).then(
-        fn=lambda error: gr.Warning(error) if error else None,
-        inputs=[error_output],
-        outputs=[]
-    ).then(              # fill spreadsheet editor
-    fn=dialogue_to_df,
-        inputs=[cached_dialogue],          
-        outputs=[df_editor],
-     )
-
-    regenerate_btn.click(
+        outputs=[audio_output, transcript_output, original_text_output, error_output, cached_dialogue, ],
+        concurrency_limit=GENERATE_CONCURRENCY_LIMIT,
+    ))
+
+    attach_post_generate(regenerate_btn.click(
         fn=lambda use_edit, edit, *args: validate_and_generate_audio(
             *args[:12],  # All inputs up to podcast_dialog_instructions
             edit if use_edit else "",  # Use edited transcript if checkbox is checked, otherwise empty string
-            *args[12:]  # user_feedback and original_text_output
+            *args[12:],  # user_feedback and original_text_output
+            use_cached_dialogue=False,  # Regenerating must produce a new dialogue
         ),
         inputs=[
             use_edited_transcript, edited_transcript,
@@ -1264,23 +1099,9 @@ with gr.Blocks(title="PDF to Audio", css="""
             prelude_dialog, podcast_dialog_instructions,
             user_feedback, original_text_output
         ],
-        outputs=[audio_output, transcript_output, original_text_output, error_output, cached_dialogue, ]
-    ).then(
-        fn=lambda audio, transcript, original_text, error: (
-            transcript if transcript else "",
-            error if error else None
-        ),
-        inputs=[audio_output, transcript_output, original_text_output, error_output],
-        outputs=[edited_transcript, error_output]
-    ).then(
-        fn=lambda error: gr.Warning(error) if error else None,
-        inputs=[error_output],
-        outputs=[]
-    ).then(                          # fill spreadsheet editor
-    fn=dialogue_to_df,
-        inputs=[cached_dialogue],          
-        outputs=[df_editor],
-     )
+        outputs=[audio_output, transcript_output, original_text_output, error_output, cached_dialogue, ],
+        concurrency_limit=GENERATE_CONCURRENCY_LIMIT,
+    ))
 
     with gr.Row():
         save_md_btn = gr.Button("Download Markdown of Dialogue")
@@ -1290,6 +1111,7 @@ with gr.Blocks(title="PDF to Audio", css="""
         fn=save_dialogue_as_markdown,
         inputs=[cached_dialogue],
         outputs=[markdown_file_output],
+        concurrency_limit=UI_CONCURRENCY_LIMIT,
     )
 
     # Add README content at the bottom
@@ -1297,10 +1119,21 @@ with gr.Blocks(title="PDF to Audio", css="""
     gr.Markdown(read_readme())
     
 # Enable queueing for better performance
-demo.queue(max_size=20, default_concurrency_limit=32)
+demo.queue(max_size=20, default_concurrency_limit=32, api_open=False)
 
 # Launch the Gradio app
 if __name__ == "__main__":
-    demo.launch(share=True)
+    # Delete old generated MP3s in the background; only the serving process sweeps,
+    # not every process that imports this module
+    threading.Thread(target=_mp3_cleaner_loop, name="mp3-cleaner", daemon=True).start()
+
+    # A public gradio.live tunnel adds a network hop to every update, so it is opt-in
+    demo.launch(
+        share=os.environ.get("GRADIO_SHARE") == "1",
+        # Gradio's own GRADIO_SERVER_NAME / GRADIO_SERVER_PORT still apply; PORT
+        # (set by most hosting platforms) takes precedence over GRADIO_SERVER_PORT
+        server_name=os.environ.get("GRADIO_SERVER_NAME", "0.0.0.0"),
+        server_port=int(os.environ["PORT"]) if "PORT" in os.environ else None,
+    )
 
 #demo.launch()
\ No newline at end of file